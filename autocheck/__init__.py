@@ -3,6 +3,8 @@ from .core import (
     check_symbolic,
     check_absolute_numeric,
     check_relative_numeric,
+    check_distribution,
+    check_estimate,
     track)
 
 __version__ = '0.1.7'
@@ -1,9 +1,14 @@
 '''
 Core functions for checking student answers and providing feedback.
 '''
+import os
 
 from .cache import check_cache
+from .datasets import is_expected_file, open_expected, check_expected_file
+from .stochastic import MAX_SAMPLES, compare_distribution, compare_estimate
 from .notebook_state_tracker import notebook_state_tracker
+from .result import CheckResult, as_check_result
+from .shadow import shadow_evaluator
 
 
 def display_failure(result):
@@ -12,10 +17,11 @@ def display_failure(result):
     in `result`. This typically happens when an exception was raised.  Hints are
     provided if the student input was empty or contains a common error.
     '''
+    result = as_check_result(result)
     print(
         '⚠️ I could not check the answer because there was an error.\n'
         'I got this input\n')
-    print(result['answer'])
+    print(result.answer_str)
     print()
     if result['answer'] in [..., None]:
         print("⚠️ HINT: It looks like you didn't enter an answer.")
@@ -38,16 +44,17 @@ def display_incorrect(result, show_answer):
     incorrect. Optionally, it displays the correct answer if `show_answer` is
     `True`.
     '''
+    result = as_check_result(result)
     if result['unique']:
         message = '❌ This answer is incorrect.'
     else:
         message = '😕 It looks like you tried that answer before.'
     print(message)
     print('I got this input\n')
-    print(result['answer'])
+    print(result.answer_str)
     if show_answer:
         print('\nbut was expecting this\n')
-        print(result['expected'])
+        print(result.expected_str)
         print('\nPlease try again.')
     else:
         print('\nbut was expecting something else. Please try again.')
@@ -75,12 +82,12 @@ def track(vars=None, name=None, course=None, lp=None, workbook=None):
     if (name is None) or (course is None):
         return
     notebook_state_tracker.process_new_cells()
-    result = {
-        'name': name,
-        'course': course,
-        'lp': lp,
-        'workbook': workbook,
-        'track_vars': vars}
+    result = CheckResult(
+        name=name,
+        course=course,
+        lp=lp,
+        workbook=workbook,
+        track_vars=vars)
     # Push outcome of the response check to the tracker
     notebook_state_tracker.process_check_result(result)
 
@@ -106,8 +113,11 @@ def process_result(
     The user can provide callback functions for `correct` when the answer is
     correct, `incorrect` when the answer was incorrect, and `failure` for when
     an exception occurred. The `result` dictionary which contains the user
-    and expected answers provided is passed as the only argument.
+    and expected answers provided is passed as the only argument. It is passed
+    as a `CheckResult`, which is a `dict` subclass.
     '''
+    original = result
+    result = as_check_result(result)
 
     # Allow tracking only if the course and question name are specified
     enable_tracking &= (name is not None) and (course is not None)
@@ -119,6 +129,18 @@ def process_result(
     result['course'] = course
     result['lp'] = lp
     result['workbook'] = workbook
+    if 'error' not in result and not result['passed']:
+        # Check that this response is not the same as earlier ones
+        unique_attempts = check_cache.setdefault(result['name'], [])
+        cache_result = result.answer_hash
+        if cache_result not in unique_attempts:
+            result['unique'] = True
+            unique_attempts.append(cache_result)
+        else:
+            result['unique'] = False
+    # Record the same fields in a plain dictionary passed in by the caller
+    if original is not result:
+        original.update(result)
     # Handle the outcome of the response check
     if 'error' in result:
         print(result['error'])
@@ -130,14 +152,6 @@ def process_result(
         if callback_correct:
             _do_callback(callback_correct, result)
     else:
-        # Check that this response is not the same as earlier ones
-        unique_attempts = check_cache.setdefault(result['name'], [])
-        cache_result = str(result['answer'])
-        if cache_result not in unique_attempts:
-            result['unique'] = True
-            unique_attempts.append(cache_result)
-        else:
-            result['unique'] = False
         show_answer = show_answer and len(unique_attempts) > 2
         display_incorrect(result, show_answer)
         if callback_incorrect:
@@ -179,40 +193,71 @@ def check_function(function, answer, **kwargs):
     process_result(result, **kwargs)
 
 
+def symbolic_equal(expected, answer):
+    '''
+    Return whether two symbolic SymPy expressions are equal, either because
+    their difference simplifies to 0 or their ratio simplifies to 1.
+    '''
+    from sympy import simplify, powdenest
+    return (
+        bool(
+            simplify(
+                powdenest(
+                    answer - expected,
+                    force=True),
+                rational=True, inverse=True) == 0)
+        or bool(
+            simplify(
+                powdenest(
+                    answer / expected,
+                    force=True),
+                rational=True, inverse=True) == 1))
+
+
 def check_symbolic(expected, answer, **kwargs):
     '''
     Compare two symbolic SymPy expressions and check that they are equal.
+
+    A sample of checks is also run through a candidate strategy in the
+    background, after feedback has been shown, when shadow evaluation is
+    enabled. See `autocheck.shadow`.
     '''
-    from sympy import simplify, powdenest
+    import time
     try:
-        result = {
-        'passed': (
-            bool(
-                simplify(
-                    powdenest(
-                        answer - expected,
-                        force=True),
-                    rational=True, inverse=True) == 0)
-            or bool(
-                simplify(
-                    powdenest(
-                        answer / expected,
-                        force=True),
-                    rational=True, inverse=True) == 1))}
+        start = time.thread_time()
+        result = {'passed': symbolic_equal(expected, answer)}
+        elapsed = time.thread_time() - start
     except:
         result = process_exception()
     result['answer'] = answer
     result['expected'] = expected
     process_result(result, **kwargs)
+    if 'error' not in result:
+        shadow_evaluator.submit(
+            'check_symbolic', expected, answer, result['passed'], elapsed,
+            name=kwargs.get('name'))
 
 
 def check_absolute_numeric(expected, answer, tolerance=0, **kwargs):
     '''
     Numeric absolute error check: abs(answer - expected) <= tolerance. The
     default tolerance is 0 which means the values have to match precisely.
+
+    `expected` can also be the path of an `.npy` or `.npz` answer file, in
+    which case every element of the answer array is checked against the
+    memory-mapped expected array. The path is recorded in 'expected_file' and
+    the (truncated) expected values are shown if `show_answer` is `True`. See
+    `autocheck.datasets`.
     '''
     try:
-        result = {'passed': bool(abs(answer - expected) <= tolerance)}
+        if is_expected_file(expected):
+            result = {
+                'passed': check_expected_file(expected, answer, tolerance),
+                'expected_file': os.fspath(expected)}
+            # Show (and track) the mapped values rather than the file name
+            expected = open_expected(expected)
+        else:
+            result = {'passed': bool(abs(answer - expected) <= tolerance)}
     except:
         result = process_exception()
     result['answer'] = answer
@@ -223,9 +268,58 @@ def check_absolute_numeric(expected, answer, tolerance=0, **kwargs):
 def check_relative_numeric(expected, answer, tolerance=1e-6, **kwargs):
     '''
     Numeric relative error check: abs(answer/expected - 1) <= tolerance.
+
+    `expected` can also be the path of an `.npy` or `.npz` answer file, as for
+    `check_absolute_numeric`.
+    '''
+    try:
+        if is_expected_file(expected):
+            result = {
+                'passed': check_expected_file(
+                    expected, answer, tolerance, relative=True),
+                'expected_file': os.fspath(expected)}
+            expected = open_expected(expected)
+        else:
+            result = {'passed': bool(abs(answer/expected - 1) <= tolerance)}
+    except:
+        result = process_exception()
+    result['answer'] = answer
+    result['expected'] = expected
+    process_result(result, **kwargs)
+
+
+def check_distribution(
+    expected, answer, significance=0.001, max_samples=MAX_SAMPLES, **kwargs):
+    '''
+    Statistical check that the values in `answer` are a random sample from the
+    distribution given by `expected`. The expected distribution can be a
+    reference sample, a frozen SciPy distribution or a vectorized cumulative
+    distribution function. A correct answer fails with probability of about
+    `significance` per test done. Samples larger than `max_samples` are
+    sub-sampled. See `autocheck.stochastic.compare_distribution`.
+    '''
+    try:
+        result = compare_distribution(
+            expected, answer, significance, max_samples)
+    except:
+        result = process_exception()
+    result['answer'] = answer
+    result['expected'] = expected
+    process_result(result, **kwargs)
+
+
+def check_estimate(
+    expected, answer, standard_error=None, confidence=0.999,
+    max_samples=MAX_SAMPLES, **kwargs):
+    '''
+    Statistical check of a Monte Carlo estimate: the `expected` value has to
+    lie in the `confidence` interval around the estimate. The answer is either
+    an estimate, with its `standard_error`, or an array of samples whose mean
+    is the estimate. See `autocheck.stochastic.compare_estimate`.
     '''
     try:
-        result = {'passed': bool(abs(answer/expected - 1) <= tolerance)}
+        result = compare_estimate(
+            expected, answer, standard_error, confidence, max_samples)
     except:
         result = process_exception()
     result['answer'] = answer
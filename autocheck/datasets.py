@@ -0,0 +1,259 @@
+'''
+Support for expected answers stored in `.npy` or `.npz` files next to a
+workbook. Large expected arrays are memory-mapped rather than loaded, so they
+never have to be embedded in or recomputed by the workbook.
+
+An optional sidecar file (`<answer file>.digest.json`, or
+`<answer file>.<key>.digest.json` for an `.npz` member) stores precomputed
+block digests and statistics of the expected array. Create it once when
+authoring the exercise using
+
+import autocheck.datasets
+autocheck.datasets.write_digest('answers/question_1.npy')
+
+With an up-to-date sidecar present, exact matches are accepted by hashing the
+student answer without reading the expected file. Tolerance checks stream
+through the expected array one block at a time.
+'''
+import json
+import os
+
+'''
+Number of array elements per block when hashing or comparing arrays.
+'''
+BLOCK_SIZE = 2 ** 16
+
+'''
+Cache of loaded sidecar files, keyed by (path, key).
+'''
+digest_cache = {}
+
+
+def is_expected_file(expected):
+    '''
+    Return `True` if `expected` is a reference to an answer file rather than an
+    expected value. References are paths ending in `.npy` or `.npz`, optionally
+    followed by `:key` to select an array from an `.npz` file.
+    '''
+    if not isinstance(expected, (str, os.PathLike)):
+        return False
+    path, _ = _split_reference(expected)
+    return path.endswith(('.npy', '.npz'))
+
+
+def _split_reference(reference):
+    reference = os.fspath(reference)
+    path, separator, key = reference.rpartition(':')
+    if separator and path.endswith('.npz'):
+        return path, key
+    return reference, None
+
+
+def _digest_path(path, key):
+    if key is None:
+        return f'{path}.digest.json'
+    return f'{path}.{key}.digest.json'
+
+
+def open_expected(reference):
+    '''
+    Open the array referred to by `reference` as a read-only memory map. An
+    `.npz` file must have been written with `numpy.savez` (not
+    `numpy.savez_compressed`) since compressed members cannot be mapped. If the
+    `.npz` file contains more than one array, select one with `path.npz:key`.
+    '''
+    import numpy as np
+    path, key = _split_reference(reference)
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    return _open_npz_member(path, key)
+
+
+def _open_npz_member(path, key):
+    import zipfile
+    import numpy as np
+    from numpy.lib import format
+
+    with zipfile.ZipFile(path) as archive:
+        names = [name[:-len('.npy')] for name in archive.namelist()]
+        if key is None:
+            if len(names) != 1:
+                raise ValueError(
+                    f'{path} contains several arrays ({", ".join(names)}); '
+                    f'select one with "{path}:<key>".')
+            key = names[0]
+        info = archive.getinfo(key + '.npy')
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError(
+            f'Array "{key}" in {path} is compressed and cannot be '
+            'memory-mapped. Save it with numpy.savez instead.')
+    with open(path, 'rb') as f:
+        # Skip the zip local file header to reach the embedded .npy data
+        f.seek(info.header_offset + 26)
+        name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+        f.seek(int(name_length) + int(extra_length), os.SEEK_CUR)
+        version = format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = format.read_array_header_2_0(f)
+        offset = f.tell()
+    return np.memmap(
+        path, dtype=dtype, mode='r', offset=offset, shape=shape,
+        order='F' if fortran_order else 'C')
+
+
+def _iter_blocks(array, block_size=BLOCK_SIZE):
+    flat = array.reshape(-1, order='A')
+    for start in range(0, flat.size, block_size):
+        yield flat[start:start + block_size]
+
+
+def _block_digest(block):
+    import hashlib
+    import numpy as np
+    return hashlib.sha256(np.ascontiguousarray(block).tobytes()).hexdigest()
+
+
+def compute_digest(array, block_size=BLOCK_SIZE):
+    '''
+    Compute the block digests and summary statistics of `array`, reading it one
+    block at a time.
+    '''
+    import numpy as np
+    digest = {
+        'dtype': array.dtype.str,
+        'shape': list(array.shape),
+        'fortran_order': bool(
+            array.flags.f_contiguous and not array.flags.c_contiguous),
+        'block_size': block_size,
+        'blocks': [],
+        'min': None,
+        'max': None}
+    # Statistics are only meaningful (and JSON-serializable) for real values
+    real = (
+        np.issubdtype(array.dtype, np.floating)
+        or np.issubdtype(array.dtype, np.integer))
+    for block in _iter_blocks(array, block_size):
+        digest['blocks'].append(_block_digest(block))
+        if real and block.size > 0:
+            block_min, block_max = block.min().item(), block.max().item()
+            if digest['min'] is None:
+                digest['min'], digest['max'] = block_min, block_max
+            else:
+                digest['min'] = min(digest['min'], block_min)
+                digest['max'] = max(digest['max'], block_max)
+    return digest
+
+
+def write_digest(reference, block_size=BLOCK_SIZE):
+    '''
+    Write the sidecar digest file for the answer file `reference`. Call this
+    again whenever the answer file changes.
+    '''
+    path, key = _split_reference(reference)
+    digest = compute_digest(open_expected(reference), block_size)
+    stat = os.stat(path)
+    digest['file_size'] = stat.st_size
+    digest['file_mtime_ns'] = stat.st_mtime_ns
+    with open(_digest_path(path, key), 'w') as f:
+        json.dump(digest, f)
+    digest_cache.pop((path, key), None)
+    return digest
+
+
+def load_digest(reference):
+    '''
+    Return the sidecar digest for `reference`, or `None` if there is no
+    sidecar. A warning is issued and `None` is returned if the answer file was
+    modified after the sidecar was written.
+    '''
+    path, key = _split_reference(reference)
+    if (path, key) not in digest_cache:
+        try:
+            with open(_digest_path(path, key)) as f:
+                digest = json.load(f)
+        except (OSError, ValueError):
+            digest = None
+        digest_cache[(path, key)] = digest
+    digest = digest_cache[(path, key)]
+    if digest is None:
+        return None
+    stat = os.stat(path)
+    if (digest.get('file_size') != stat.st_size
+            or digest.get('file_mtime_ns') != stat.st_mtime_ns):
+        import warnings
+        warnings.warn(
+            f'The digest of {path} is out of date and is ignored. Run '
+            'autocheck.datasets.write_digest again after changing an answer '
+            'file.')
+        return None
+    return digest
+
+
+def _matches_digest(answer, digest):
+    '''
+    Return `True` if the answer is byte-for-byte identical to the expected
+    array. A mismatch does not imply that the values differ (for example, 0.0
+    and -0.0, or the same values stored with another dtype).
+    '''
+    import numpy as np
+    if answer.dtype.str != digest['dtype']:
+        return False
+    answer = np.asarray(answer, order='F' if digest['fortran_order'] else 'C')
+    blocks = _iter_blocks(answer, digest['block_size'])
+    return all(
+        _block_digest(block) == expected
+        for block, expected in zip(blocks, digest['blocks']))
+
+
+def check_expected_file(reference, answer, tolerance=0, relative=False):
+    '''
+    Compare the student's `answer` to the array in the answer file `reference`
+    and return whether it passed.
+
+    If `relative` is `False`, every element must satisfy
+    abs(answer - expected) <= tolerance, otherwise every element must satisfy
+    abs(answer/expected - 1) <= tolerance.
+    '''
+    import numpy as np
+    answer = np.asarray(answer)
+    digest = load_digest(reference)
+    if digest is not None:
+        if tuple(answer.shape) != tuple(digest['shape']):
+            return False
+        if tolerance == 0 and not relative:
+            if _matches_digest(answer, digest):
+                return True
+        if (not relative and digest['min'] is not None and answer.size > 0
+                and (np.issubdtype(answer.dtype, np.floating)
+                     or np.issubdtype(answer.dtype, np.integer))):
+            # Cheap rejection: extremes cannot differ by more than tolerance
+            # if every element is within tolerance. Compare Python numbers so
+            # that small or unsigned integer dtypes cannot wrap around.
+            if (abs(answer.min().item() - digest['min']) > tolerance
+                    or abs(answer.max().item() - digest['max']) > tolerance):
+                return False
+
+    expected = open_expected(reference)
+    if answer.shape != expected.shape:
+        return False
+    fortran_order = (
+        expected.flags.f_contiguous and not expected.flags.c_contiguous)
+    answer_blocks = _iter_blocks(
+        np.asarray(answer, order='F' if fortran_order else 'C'))
+    expected_blocks = _iter_blocks(expected)
+    for answer_block, expected_block in zip(answer_blocks, expected_blocks):
+        if (np.issubdtype(answer_block.dtype, np.integer)
+                and np.issubdtype(expected_block.dtype, np.integer)):
+            # Subtract in (at least) int64 so unsigned values do not wrap
+            dtype = np.result_type(answer_block, expected_block, np.int64)
+            answer_block = answer_block.astype(dtype)
+            expected_block = expected_block.astype(dtype)
+        if relative:
+            error = np.abs(answer_block / expected_block - 1)
+        else:
+            error = np.abs(answer_block - expected_block)
+        if not np.all(error <= tolerance):
+            return False
+    return True
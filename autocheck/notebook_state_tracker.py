@@ -1,5 +1,7 @@
 import json
 
+from .result import CheckResult
+
 '''
 Globals for controlling whether tracking is active and where information is
 sent. These variables are set here rather than in an environment since the
@@ -150,8 +152,23 @@ class NotebookStateTracker:
         self.process_old_futures()
 
         payload = self.init_json_payload()
+        if isinstance(result, CheckResult):
+            # Reuse the answers converted once for display and caching
+            result = result.json_payload
         payload['check_result'] = result
         self.post(payload)
 
+    def process_shadow_result(self, record):
+        '''
+        Send the outcome of a shadow evaluation (see `autocheck.shadow`) to the
+        tracking server.
+        '''
+        if not self.tracking: return
+        self.process_old_futures()
+
+        payload = self.init_json_payload()
+        payload['shadow_result'] = record
+        self.post(payload)
+
 
 notebook_state_tracker = NotebookStateTracker()
@@ -0,0 +1,146 @@
+'''
+The record passed between the check functions, the attempt cache, the display
+functions, user callbacks and the tracker.
+'''
+_JSON_TYPES = (str, int, float, bool, type(None), list, tuple, dict)
+_UNSET = object()
+
+
+class CheckResult(dict):
+    '''
+    The `dict` of a single check, as callbacks have always received it, which
+    also memoizes the expensive conversions of the student and expected
+    answers so that each of them happens at most once per check:
+
+    * `answer_str` and `expected_str`: the string forms shown to the student,
+    * `answer_hash`: the key used to detect repeated attempts, and
+    * `json_payload`: the JSON-ready form sent to the tracking server.
+
+    Any change to the dictionary clears the memoized values that depend on it.
+    '''
+    __slots__ = ('_answer_str', '_expected_str', '_answer_hash', '_payload')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._clear()
+
+    def _clear(self, key=None):
+        if key in (None, 'answer'):
+            self._answer_str = _UNSET
+            self._answer_hash = _UNSET
+        if key in (None, 'expected'):
+            self._expected_str = _UNSET
+        self._payload = _UNSET
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._clear(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._clear(key)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._clear()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._clear(key)
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._clear(item[0])
+        return item
+
+    def clear(self):
+        super().clear()
+        self._clear()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def copy(self):
+        return type(self)(self)
+
+    @property
+    def answer_str(self):
+        if self._answer_str is _UNSET:
+            self._answer_str = str(self.get('answer'))
+        return self._answer_str
+
+    @property
+    def expected_str(self):
+        if self._expected_str is _UNSET:
+            self._expected_str = str(self.get('expected'))
+        return self._expected_str
+
+    @property
+    def answer_hash(self):
+        '''
+        Canonical hash of the answer. NumPy arrays with at least one dimension
+        are hashed by dtype, shape and contents since their string form is
+        truncated for large arrays. Everything else, including scalars and
+        arrays of Python objects, is hashed by its string form, so that 1.5 and
+        numpy.float64(1.5) count as the same attempt.
+        '''
+        if self._answer_hash is _UNSET:
+            import hashlib
+            answer = self.get('answer')
+            digest = hashlib.sha256()
+            if _is_byte_hashable(answer):
+                import numpy as np
+                from .datasets import BLOCK_SIZE
+                digest.update(f'{answer.dtype.str}{answer.shape}'.encode())
+                # Hash block by block to avoid copying large (or mapped)
+                # arrays in full
+                flat = answer.reshape(-1)
+                for start in range(0, flat.size, BLOCK_SIZE):
+                    block = flat[start:start + BLOCK_SIZE]
+                    digest.update(memoryview(np.ascontiguousarray(block)))
+            else:
+                digest.update(self.answer_str.encode())
+            self._answer_hash = digest.hexdigest()
+        return self._answer_hash
+
+    @property
+    def json_payload(self):
+        '''
+        A plain dictionary that can be sent to the tracking server. Answers
+        that JSON cannot represent are replaced by their (memoized) string
+        form.
+        '''
+        if self._payload is _UNSET:
+            payload = dict(self)
+            for key in ['answer', 'expected']:
+                if key in payload:
+                    value = payload[key]
+                    if value is Ellipsis:
+                        payload[key] = '...'
+                    elif not isinstance(value, _JSON_TYPES):
+                        payload[key] = getattr(self, key + '_str')
+            self._payload = payload
+        return self._payload
+
+
+def _is_byte_hashable(answer):
+    return (
+        all(hasattr(answer, name) for name in ('dtype', 'shape', 'ndim'))
+        and answer.ndim > 0
+        and not answer.dtype.hasobject)
+
+
+def as_check_result(result):
+    '''
+    Return `result` as a `CheckResult`, wrapping plain dictionaries.
+    '''
+    if isinstance(result, CheckResult):
+        return result
+    return CheckResult(result)
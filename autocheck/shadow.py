@@ -0,0 +1,186 @@
+'''
+Shadow evaluation of alternative checking strategies. For a random sample of
+live checks, an alternative strategy is run on the same inputs in a background
+thread after the student has received feedback from the current strategy. The
+verdicts and timings of both are compared and recorded, so that a faster
+strategy can be adopted once it is known to agree with the current one.
+
+Shadow evaluation is off by default. Turn it on right after importing the
+library using
+
+import autocheck
+autocheck.shadow.shadow_evaluator.sample_rate = 0.1
+
+Records are sent to the tracking server if tracking is active and are
+otherwise appended, one JSON object per line, to the file named by
+`shadow_evaluator.log_path` (if set). Since the tracker is not thread-safe,
+records are sent from the main thread on the next check (or by calling
+`shadow_evaluator.wait()`) rather than from the background thread. Records that
+are still waiting when the interpreter exits are sent from an `atexit` hook.
+
+At most `shadow_evaluator.max_pending` evaluations are queued or running at a
+time; checks are not sampled while that many are in flight. This bounds the
+CPU time the background thread takes from the kernel and the time an exiting
+interpreter waits for the (non-daemon) worker thread.
+
+Both strategies are timed with `time.thread_time`, the CPU time of the thread
+that runs them, so that the background thread competing with the kernel does
+not bias the measured speedup.
+'''
+import json
+import random
+import time
+
+from .notebook_state_tracker import notebook_state_tracker, CustomJsonEncoder
+
+'''
+Fraction of checks that are shadow-evaluated, the maximum number of
+evaluations in flight, and the local log file used when tracking is not active.
+'''
+SHADOW_SAMPLE_RATE = 0
+SHADOW_MAX_PENDING = 1
+SHADOW_LOG = ''
+
+
+def symbolic_equal_by_sampling(expected, answer, samples=5, tolerance=1e-9):
+    '''
+    Candidate strategy for `check_symbolic`: evaluate both expressions at
+    random positive values of their free symbols and compare the results
+    numerically instead of simplifying their difference.
+    '''
+    from sympy import Float, sympify
+    expected, answer = sympify(expected), sympify(answer)
+    symbols = sorted(
+        answer.free_symbols | expected.free_symbols, key=lambda s: s.name)
+    rng = random.Random(0)
+    for _ in range(samples):
+        values = {s: Float(rng.uniform(0.5, 2.5)) for s in symbols}
+        expected_value = complex(expected.evalf(subs=values))
+        answer_value = complex(answer.evalf(subs=values))
+        error = abs(answer_value - expected_value)
+        if error > tolerance * (1 + abs(expected_value)):
+            return False
+    return True
+
+
+def _serialize(expression):
+    try:
+        from sympy import srepr
+        return srepr(expression)
+    except:
+        return str(expression)
+
+
+class ShadowEvaluator:
+    '''
+    Run candidate strategies alongside the checker currently in use and record
+    how often, and how fast, they agree with it. Candidates are registered per
+    checker in `strategies` as functions taking (expected, answer) and
+    returning whether the answer passed.
+    '''
+
+    def __init__(self):
+        self.sample_rate = SHADOW_SAMPLE_RATE
+        self.max_pending = SHADOW_MAX_PENDING
+        self.log_path = SHADOW_LOG
+        self.strategies = {
+            'check_symbolic': symbolic_equal_by_sampling}
+        self.executor = None
+        self.futures = []
+        # A private generator, so that sampling does not advance the global
+        # `random` stream that seeded exercises rely on
+        self.random = random.Random()
+
+    def submit(self, checker, expected, answer, passed, elapsed, name=None):
+        '''
+        Schedule a shadow evaluation of a check that has already been done by
+        `checker`, which returned `passed` after `elapsed` seconds of thread
+        CPU time. Nothing is done unless the check is sampled, fewer than
+        `max_pending` evaluations are in flight, and a candidate strategy is
+        registered for `checker`. Records of evaluations that have finished
+        since the last call are sent first.
+        '''
+        self.record_finished()
+        if self.sample_rate <= 0 or len(self.futures) >= self.max_pending:
+            return
+        strategy = self.strategies.get(checker)
+        if strategy is None or self.random.random() >= self.sample_rate:
+            return
+        if self.executor is None:
+            import atexit
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=1)
+            # The worker is joined before atexit hooks run, so this sends the
+            # records of the last evaluations
+            atexit.register(self.record_finished)
+        self.futures.append(self.executor.submit(
+            self.evaluate, checker, strategy, expected, answer, passed,
+            elapsed, name))
+
+    def evaluate(
+        self, checker, strategy, expected, answer, passed, elapsed, name):
+        '''
+        Run `strategy` and return a record of how it compares to the primary
+        verdict. Exceptions are recorded rather than raised since this runs in
+        the background.
+        '''
+        record = {
+            'checker': checker,
+            'strategy': getattr(strategy, '__name__', str(strategy)),
+            'name': name,
+            'primary_passed': passed,
+            'primary_time': elapsed}
+        try:
+            start = time.thread_time()
+            shadow_passed = bool(strategy(expected, answer))
+            record['shadow_time'] = time.thread_time() - start
+        except Exception as e:
+            record['agree'] = False
+            record['error'] = f'{type(e).__name__}: {e}'
+        else:
+            record['shadow_passed'] = shadow_passed
+            record['agree'] = shadow_passed == passed
+            if record['shadow_time'] > 0:
+                record['speedup'] = elapsed / record['shadow_time']
+        if not record['agree']:
+            record['expected'] = _serialize(expected)
+            record['answer'] = _serialize(answer)
+        return record
+
+    def record_finished(self):
+        '''
+        Send the records of all finished shadow evaluations. This runs on the
+        main thread.
+        '''
+        pending = []
+        for future in self.futures:
+            if future.done():
+                try:
+                    self.record(future.result())
+                except:
+                    pass
+            else:
+                pending.append(future)
+        self.futures = pending
+
+    def record(self, record):
+        '''
+        Send a shadow evaluation record to the tracker or the local log file.
+        '''
+        if notebook_state_tracker.tracking:
+            notebook_state_tracker.process_shadow_result(record)
+        elif self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(record, cls=CustomJsonEncoder) + '\n')
+
+    def wait(self):
+        '''
+        Block until all scheduled shadow evaluations have finished and send
+        their records.
+        '''
+        for future in self.futures:
+            future.exception()
+        self.record_finished()
+
+
+shadow_evaluator = ShadowEvaluator()
@@ -0,0 +1,190 @@
+'''
+Vectorized statistical tests used to check random samples and Monte Carlo
+estimates. Only NumPy is required. Very large samples are sub-sampled (with a
+fixed seed, so repeated checks of the same answer give the same verdict) to
+keep the time spent on a check bounded.
+'''
+import math
+
+'''
+Maximum number of sample values used in a statistical check. Larger samples
+are sub-sampled down to this size.
+'''
+MAX_SAMPLES = 100_000
+
+
+def normal_quantile(confidence):
+    '''
+    Return z such that a standard normal variable lies in [-z, z] with
+    probability `confidence`.
+    '''
+    from statistics import NormalDist
+    return NormalDist().inv_cdf(0.5 + confidence / 2)
+
+
+def as_sample(values, max_samples=MAX_SAMPLES, seed=0):
+    '''
+    Convert `values` to a flat float array of at most `max_samples` values,
+    drawn uniformly without replacement if there are more. Only the selected
+    values are converted, so large answers are not copied in full.
+    '''
+    import numpy as np
+    values = np.asarray(values)
+    if values.size < 2:
+        raise ValueError('At least 2 sample values are needed for the check.')
+    if max_samples is not None and values.size > max_samples:
+        rng = np.random.default_rng(seed)
+        indices = rng.choice(values.size, max_samples, replace=False)
+        values = values[np.unravel_index(indices, values.shape)]
+    return np.asarray(values, dtype=float).ravel()
+
+
+def ks_pvalue(statistic, n):
+    '''
+    Asymptotic p-value of the Kolmogorov-Smirnov statistic for an effective
+    sample size `n`, using Stephens' small-sample correction.
+    '''
+    import numpy as np
+    root_n = math.sqrt(n)
+    x = (root_n + 0.12 + 0.11 / root_n) * statistic
+    if x < 0.2:
+        return 1.0
+    k = np.arange(1, 101)
+    terms = 2 * (-1.0) ** (k - 1) * np.exp(-2 * k ** 2 * x ** 2)
+    return float(min(max(terms.sum(), 0.0), 1.0))
+
+
+def ks_one_sample(sample, cdf):
+    '''
+    One-sample Kolmogorov-Smirnov test of `sample` against the vectorized
+    cumulative distribution function `cdf`. Return (statistic, p-value).
+    '''
+    import numpy as np
+    sample = np.sort(sample)
+    n = sample.size
+    values = np.asarray(cdf(sample), dtype=float)
+    upper = np.arange(1, n + 1) / n - values
+    lower = values - np.arange(n) / n
+    statistic = float(max(upper.max(), lower.max()))
+    return statistic, ks_pvalue(statistic, n)
+
+
+def ks_two_sample(sample, reference):
+    '''
+    Two-sample Kolmogorov-Smirnov test of `sample` against `reference`. Return
+    (statistic, p-value).
+    '''
+    import numpy as np
+    sample = np.sort(sample)
+    reference = np.sort(reference)
+    points = np.concatenate([sample, reference])
+    cdf_sample = np.searchsorted(sample, points, side='right') / sample.size
+    cdf_reference = (
+        np.searchsorted(reference, points, side='right') / reference.size)
+    statistic = float(np.abs(cdf_sample - cdf_reference).max())
+    n = sample.size * reference.size / (sample.size + reference.size)
+    return statistic, ks_pvalue(statistic, n)
+
+
+def mean_and_standard_error(sample):
+    '''
+    Return the mean of `sample` and the standard error of that mean. The
+    sample must contain at least 2 values.
+    '''
+    if sample.size < 2:
+        raise ValueError('At least 2 sample values are needed for the check.')
+    return (
+        float(sample.mean()),
+        float(sample.std(ddof=1) / math.sqrt(sample.size)))
+
+
+def compare_distribution(
+    expected, answer, significance=0.001, max_samples=MAX_SAMPLES, seed=0):
+    '''
+    Test whether the values in `answer` could have been drawn from the
+    distribution described by `expected`. Return a dictionary with 'passed' and
+    the test statistics.
+
+    `expected` can be
+    * a reference sample (any array-like of numbers),
+    * an object with a vectorized `cdf` method, such as a frozen SciPy
+      distribution (its `mean` and `std` methods are also used if present), or
+    * a vectorized cumulative distribution function.
+
+    A Kolmogorov-Smirnov test is always done. When the expected mean is known,
+    a confidence interval check on the mean is done as well. Each test rejects
+    a correct answer with probability `significance`.
+    '''
+    sample = as_sample(answer, max_samples, seed)
+    statistics = {'sample_size': int(sample.size)}
+    mean, standard_error = mean_and_standard_error(sample)
+    expected_mean = None
+    if hasattr(expected, 'cdf') or callable(expected):
+        cdf = expected.cdf if hasattr(expected, 'cdf') else expected
+        ks_statistic, p_value = ks_one_sample(sample, cdf)
+        if hasattr(expected, 'mean') and hasattr(expected, 'std'):
+            expected_mean = float(expected.mean())
+            standard_error = float(expected.std()) / math.sqrt(sample.size)
+    else:
+        reference = as_sample(expected, max_samples, seed + 1)
+        ks_statistic, p_value = ks_two_sample(sample, reference)
+        expected_mean, reference_error = mean_and_standard_error(reference)
+        standard_error = math.hypot(standard_error, reference_error)
+    statistics['ks_statistic'] = ks_statistic
+    statistics['p_value'] = p_value
+    passed = p_value >= significance
+    # The mean check is skipped for distributions without a finite mean or
+    # variance, such as the Cauchy distribution
+    if (expected_mean is not None and math.isfinite(expected_mean)
+            and math.isfinite(standard_error)):
+        z = normal_quantile(1 - significance)
+        statistics['mean'] = mean
+        statistics['expected_mean'] = expected_mean
+        passed &= abs(mean - expected_mean) <= z * standard_error
+    return {'passed': bool(passed), 'statistics': statistics}
+
+
+def compare_estimate(
+    expected, answer, standard_error=None, confidence=0.999,
+    max_samples=MAX_SAMPLES, seed=0):
+    '''
+    Test whether a Monte Carlo estimate is consistent with the `expected`
+    value. Return a dictionary with 'passed' and the test statistics.
+
+    `answer` is either the estimate itself, in which case `standard_error` has
+    to be given, or an array of independent samples whose mean is the
+    estimate. For samples, the standard error is computed from (at most
+    `max_samples` of) the samples unless it is given, in which case the
+    estimate is the mean of all samples. The check passes if `expected` lies
+    in the `confidence` interval around the estimate.
+    '''
+    import numpy as np
+    if np.ndim(answer) == 0:
+        if standard_error is None:
+            raise ValueError(
+                'A standard error is needed to check a single estimate.')
+        estimate = float(answer)
+        sample_size = None
+    elif standard_error is None:
+        sample = as_sample(answer, max_samples, seed)
+        estimate, standard_error = mean_and_standard_error(sample)
+        sample_size = int(sample.size)
+    else:
+        # The given standard error is that of the mean of all samples, so the
+        # estimate has to be that mean too, not the mean of a sub-sample
+        sample = np.asarray(answer)
+        if sample.size < 2:
+            raise ValueError(
+                'At least 2 sample values are needed for the check.')
+        estimate = float(sample.mean())
+        sample_size = int(sample.size)
+    if not math.isfinite(standard_error):
+        raise ValueError('The standard error must be finite.')
+    half_width = normal_quantile(confidence) * standard_error
+    return {
+        'passed': bool(abs(estimate - expected) <= half_width),
+        'statistics': {
+            'estimate': estimate,
+            'standard_error': float(standard_error),
+            'interval': [estimate - half_width, estimate + half_width],
+            'sample_size': sample_size}}
@@ -216,3 +216,21 @@ class Tests(unittest.TestCase):
         with patch('sys.stdout', new=StringIO()) as patched_out:
             check_symbolic(expected, answer)
             self.assertEqual(patched_out.getvalue(), self.correct_output)
+
+    def test_check_function_result_updated_in_place(self):
+        '''The dictionary returned by a check function gets the problem identifiers'''
+        returned = {}
+
+        def check_answer(answer):
+            returned['result'] = {'passed': False, 'expected': 1}
+            return returned['result']
+
+        def callback(result):
+            self.assertIsInstance(result, dict)
+            result.copy()
+
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_function(
+                check_answer, 2, name='test_in_place', callback_incorrect=callback)
+        self.assertEqual(returned['result']['name'], 'test_in_place')
+        self.assertTrue(returned['result']['unique'])
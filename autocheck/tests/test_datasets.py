@@ -0,0 +1,137 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from io import StringIO
+
+from ..core import check_absolute_numeric, check_relative_numeric
+from ..datasets import (
+    is_expected_file, open_expected, write_digest, load_digest,
+    check_expected_file,
+)
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        import numpy as np
+        self.directory = tempfile.TemporaryDirectory()
+        self.expected = np.linspace(1, 2, 1000).reshape(10, 100)
+        self.npy_path = os.path.join(self.directory.name, 'expected.npy')
+        np.save(self.npy_path, self.expected)
+        self.npz_path = os.path.join(self.directory.name, 'expected.npz')
+        np.savez(self.npz_path, first=self.expected, second=2 * self.expected)
+        self.correct_output = '✅ Success!\n'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_is_expected_file(self):
+        '''Paths to .npy and .npz files are recognized as answer files'''
+        self.assertTrue(is_expected_file('answer.npy'))
+        self.assertTrue(is_expected_file('answer.npz:first'))
+        self.assertFalse(is_expected_file('answer.txt'))
+        self.assertFalse(is_expected_file(1.5))
+
+    def test_open_npz_member(self):
+        '''Arrays in uncompressed .npz files are memory-mapped'''
+        import numpy as np
+        second = open_expected(self.npz_path + ':second')
+        self.assertIsInstance(second, np.memmap)
+        self.assertTrue(np.array_equal(second, 2 * self.expected))
+        with self.assertRaises(ValueError):
+            open_expected(self.npz_path)
+
+    def test_exact_match_by_digest(self):
+        '''Exact matches are accepted from the sidecar without reading the expected file'''
+        write_digest(self.npy_path)
+        self.assertIsNotNone(load_digest(self.npy_path))
+        with patch('autocheck.datasets.open_expected') as patched_open:
+            self.assertTrue(check_expected_file(self.npy_path, self.expected.copy()))
+            patched_open.assert_not_called()
+        self.assertFalse(check_expected_file(self.npy_path, self.expected + 1e-9))
+
+    def test_tolerance_streaming(self):
+        '''Tolerance checks compare block by block with and without a sidecar'''
+        answer = self.expected + 1e-3
+        for digest in [False, True]:
+            if digest:
+                write_digest(self.npy_path, block_size=64)
+            self.assertTrue(check_expected_file(self.npy_path, answer, 1e-2))
+            self.assertFalse(check_expected_file(self.npy_path, answer, 1e-4))
+            self.assertTrue(check_expected_file(
+                self.npy_path, answer, 1e-2, relative=True))
+            self.assertFalse(check_expected_file(self.npy_path, answer[:5], 1e-2))
+
+    def test_check_numeric_with_answer_file(self):
+        '''Numeric checks accept a reference to an answer file as the expected value'''
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_absolute_numeric(self.npz_path + ':first', self.expected)
+            self.assertEqual(patched_out.getvalue(), self.correct_output)
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_relative_numeric(self.npy_path, self.expected * (1 + 1e-8))
+            self.assertEqual(patched_out.getvalue(), self.correct_output)
+
+    def test_stale_digest_ignored(self):
+        '''A sidecar is not trusted after the answer file is rewritten'''
+        import numpy as np
+        write_digest(self.npy_path)
+        stat = os.stat(self.npy_path)
+        np.save(self.npy_path, 2 * self.expected)
+        # Same size; force a different modification time in case the clock is coarse
+        os.utime(self.npy_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(load_digest(self.npy_path))
+        with self.assertWarns(UserWarning):
+            self.assertFalse(check_expected_file(self.npy_path, self.expected))
+        with self.assertWarns(UserWarning):
+            self.assertTrue(check_expected_file(self.npy_path, 2 * self.expected))
+
+    def test_complex_digest(self):
+        '''Digests of complex arrays are written without statistics'''
+        import numpy as np
+        path = os.path.join(self.directory.name, 'complex.npy')
+        np.save(path, self.expected * (1 + 1j))
+        digest = write_digest(path)
+        self.assertIsNone(digest['min'])
+        self.assertTrue(check_expected_file(path, self.expected * (1 + 1j)))
+        self.assertTrue(check_expected_file(path, self.expected * (1 + 1j) + 1e-6, 1e-5))
+
+    def test_integer_answers_with_digest(self):
+        '''A sidecar does not change the verdict for small or unsigned integer answers'''
+        import numpy as np
+        for values in [[5, 6, 7], [-5, 6, 7]]:
+            path = os.path.join(self.directory.name, 'integers.npy')
+            np.save(path, np.array(values, dtype=np.int64))
+            answer = np.array([3, 6, 7], dtype=np.uint8)
+            verdicts = []
+            for digest in [False, True]:
+                if digest:
+                    write_digest(path)
+                verdicts.append(check_expected_file(path, answer, 10))
+            self.assertEqual(verdicts, [True, True])
+            os.remove(path + '.digest.json')
+        path = os.path.join(self.directory.name, 'unsigned.npy')
+        np.save(path, np.array([5, 6, 7], dtype=np.uint8))
+        write_digest(path)
+        self.assertTrue(check_expected_file(path, np.uint8([3, 6, 7]), 2))
+        self.assertFalse(check_expected_file(path, np.uint8([3, 6, 7]), 1))
+
+    def test_show_answer_with_answer_file(self):
+        '''The expected values, not the file name, are shown to the student'''
+        class RecordResult:
+            def __call__(self, result):
+                self.result = result
+        record = RecordResult()
+        for attempt in range(3):
+            with patch('sys.stdout', new=StringIO()) as patched_out:
+                check_absolute_numeric(
+                    self.npy_path, self.expected + attempt + 1,
+                    name='test_show_answer_with_answer_file', show_answer=True,
+                    callback_incorrect=record)
+        output = patched_out.getvalue()
+        self.assertIn('but was expecting this', output)
+        self.assertIn(str(self.expected), output)
+        self.assertNotIn(self.npy_path, output)
+        self.assertEqual(record.result['expected_file'], self.npy_path)
@@ -0,0 +1,107 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from ..result import CheckResult
+from ..notebook_state_tracker import CustomJsonEncoder
+
+
+class CountingStr:
+    '''An answer that counts how often it is converted to a string'''
+
+    def __init__(self):
+        self.calls = 0
+
+    def __str__(self):
+        self.calls += 1
+        return 'counting answer'
+
+
+class Tests(unittest.TestCase):
+
+    def test_dict_compatibility(self):
+        '''Check results behave like the dictionaries passed to callbacks'''
+        result = CheckResult({'passed': True}, answer=1)
+        result['expected'] = 1
+        self.assertEqual(result, {'passed': True, 'answer': 1, 'expected': 1})
+        self.assertEqual(result.get('name'), None)
+        self.assertIn('passed', result)
+        del result['passed']
+        self.assertEqual(sorted(result), ['answer', 'expected'])
+        self.assertIsInstance(result, dict)
+        self.assertEqual(result.copy(), {'answer': 1, 'expected': 1})
+        self.assertEqual(json.loads(json.dumps(result)), {'answer': 1, 'expected': 1})
+        with self.assertRaises(AttributeError):
+            result.extra = 1
+
+    def test_string_form_computed_once(self):
+        '''The string form of the answer is memoized and reset on assignment'''
+        answer = CountingStr()
+        result = CheckResult(answer=answer, expected=2)
+        for _ in range(3):
+            self.assertEqual(result.answer_str, 'counting answer')
+        result.answer_hash
+        result.json_payload
+        self.assertEqual(answer.calls, 1)
+        result['answer'] = answer
+        result.answer_str
+        self.assertEqual(answer.calls, 2)
+        result.update(answer=answer)
+        result.answer_str
+        self.assertEqual(answer.calls, 3)
+
+    def test_array_hash(self):
+        '''Arrays with the same truncated string form have different hashes'''
+        import numpy as np
+        first = np.zeros(10000)
+        second = first.copy()
+        second[5000] = 1
+        self.assertEqual(str(first), str(second))
+        self.assertNotEqual(
+            CheckResult(answer=first).answer_hash,
+            CheckResult(answer=second).answer_hash)
+        self.assertEqual(
+            CheckResult(answer=first).answer_hash,
+            CheckResult(answer=first.copy()).answer_hash)
+
+    def test_scalar_hash(self):
+        '''NumPy scalars and Python numbers that print the same are the same attempt'''
+        import numpy as np
+        self.assertEqual(
+            CheckResult(answer=np.float64(1.5)).answer_hash,
+            CheckResult(answer=1.5).answer_hash)
+        self.assertEqual(
+            CheckResult(answer=np.array(1.5)).answer_hash,
+            CheckResult(answer=1.5).answer_hash)
+
+    def test_non_contiguous_array_hash(self):
+        '''Arrays are hashed by value regardless of their memory layout'''
+        import numpy as np
+        values = np.arange(12.0).reshape(3, 4)
+        self.assertEqual(
+            CheckResult(answer=np.asfortranarray(values)).answer_hash,
+            CheckResult(answer=values.copy()).answer_hash)
+        self.assertEqual(
+            CheckResult(answer=values[:, ::2]).answer_hash,
+            CheckResult(answer=values[:, ::2].copy()).answer_hash)
+
+    def test_object_array_hash(self):
+        '''Arrays of Python objects are hashed by value, not by pointer'''
+        import numpy as np
+        first = np.array([float('1.5'), [1, 2]], dtype=object)
+        second = np.array([float('1.5'), [1, 2]], dtype=object)
+        self.assertNotEqual(first.tobytes(), second.tobytes())
+        self.assertEqual(
+            CheckResult(answer=first).answer_hash,
+            CheckResult(answer=second).answer_hash)
+
+    def test_json_payload(self):
+        '''Check results are encoded with JSON-ready answers'''
+        result = CheckResult(
+            passed=False, answer=..., expected=CountingStr(), extra=[1, 2])
+        self.assertEqual(
+            json.loads(json.dumps(
+                {'check_result': result.json_payload}, cls=CustomJsonEncoder)),
+            {'check_result': {
+                'passed': False, 'answer': '...', 'expected': 'counting answer',
+                'extra': [1, 2]}})
@@ -0,0 +1,146 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from io import StringIO
+
+from ..core import check_symbolic
+from ..shadow import shadow_evaluator, symbolic_equal_by_sampling
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.directory.name, 'shadow.jsonl')
+        self.correct_output = '✅ Success!\n'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_checks(self, strategy, *checks):
+        '''Shadow-evaluate every check and return the logged records'''
+        with patch.multiple(
+            shadow_evaluator, sample_rate=1, log_path=self.log_path,
+            strategies={'check_symbolic': strategy}
+        ):
+            for expected, answer in checks:
+                with patch('sys.stdout', new=StringIO()) as patched_out:
+                    check_symbolic(expected, answer)
+                shadow_evaluator.wait()
+        with open(self.log_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_symbolic_equal_by_sampling(self):
+        '''The sampling strategy agrees with simplify on simple expressions'''
+        from sympy import sqrt, pi
+        from sympy.abc import n
+        self.assertTrue(symbolic_equal_by_sampling(n * (n - 1) / 2, (n ** 2 - n) / 2))
+        self.assertTrue(symbolic_equal_by_sampling(sqrt(2/pi/n), 1/sqrt(pi*n/2)))
+        self.assertFalse(symbolic_equal_by_sampling(n * (n - 1) / 2, n ** 2))
+        self.assertTrue(symbolic_equal_by_sampling(5, 5))
+        self.assertFalse(symbolic_equal_by_sampling(n, 5))
+
+    def test_global_random_stream_untouched(self):
+        '''Checks do not advance the global random stream, sampled or not'''
+        import random
+        from sympy.abc import n
+        random.seed(42)
+        expected = random.random()
+        for sample_rate in [0, 1]:
+            with patch.multiple(
+                shadow_evaluator, sample_rate=sample_rate, log_path=self.log_path
+            ):
+                random.seed(42)
+                with patch('sys.stdout', new=StringIO()):
+                    check_symbolic(n + 1, 1 + n)
+                shadow_evaluator.wait()
+                self.assertEqual(random.random(), expected)
+
+    def test_agreement_recorded(self):
+        '''Agreeing verdicts and timings are logged without the expressions'''
+        from sympy.abc import n
+        records = self.run_checks(
+            symbolic_equal_by_sampling,
+            (n * (n - 1) / 2, (n ** 2 - n) / 2),
+            (n * (n - 1) / 2, n ** 2))
+        self.assertEqual([r['primary_passed'] for r in records], [True, False])
+        for record in records:
+            self.assertTrue(record['agree'])
+            self.assertNotIn('answer', record)
+            self.assertIn('speedup', record)
+
+    def test_disagreement_recorded(self):
+        '''Disagreements and strategy errors are logged with serialized expressions'''
+        from sympy.abc import n
+
+        def broken_strategy(expected, answer):
+            raise ValueError('oops')
+
+        records = self.run_checks(lambda expected, answer: False, (n, n))
+        self.assertFalse(records[0]['agree'])
+        self.assertEqual(records[0]['answer'], "Symbol('n')")
+        os.remove(self.log_path)
+        records = self.run_checks(broken_strategy, (n, n))
+        self.assertEqual(records[0]['error'], 'ValueError: oops')
+
+    def test_feedback_unchanged(self):
+        '''Shadow evaluation starts after, and does not change, the feedback'''
+        from sympy.abc import n
+        with patch.multiple(
+            shadow_evaluator, sample_rate=1, log_path=self.log_path,
+            strategies={'check_symbolic': lambda expected, answer: False}
+        ):
+            with patch('sys.stdout', new=StringIO()) as patched_out:
+                with patch.object(
+                    shadow_evaluator, 'submit',
+                    side_effect=lambda *args, **kwargs: self.assertEqual(
+                        patched_out.getvalue(), self.correct_output)
+                ) as patched_submit:
+                    check_symbolic(n + 1, 1 + n)
+                patched_submit.assert_called_once()
+                self.assertEqual(patched_out.getvalue(), self.correct_output)
+            shadow_evaluator.wait()
+
+    def test_records_sent_from_main_thread(self):
+        '''Records are sent from the thread that runs the checks'''
+        import threading
+        from sympy.abc import n
+        threads = []
+        with patch.multiple(
+            shadow_evaluator, sample_rate=1,
+            strategies={'check_symbolic': lambda expected, answer: True}
+        ), patch.object(
+            shadow_evaluator, 'record',
+            side_effect=lambda record: threads.append(threading.current_thread())
+        ):
+            with patch('sys.stdout', new=StringIO()):
+                check_symbolic(n, n)
+            shadow_evaluator.wait()
+        self.assertEqual(threads, [threading.current_thread()])
+
+    def test_pending_evaluations_capped(self):
+        '''Checks are not sampled while max_pending evaluations are in flight'''
+        import threading
+        from sympy.abc import n
+        release = threading.Event()
+
+        def slow_strategy(expected, answer):
+            release.wait(10)
+            return True
+
+        with patch.multiple(
+            shadow_evaluator, sample_rate=1, max_pending=1,
+            log_path=self.log_path,
+            strategies={'check_symbolic': slow_strategy}
+        ):
+            for _ in range(3):
+                with patch('sys.stdout', new=StringIO()):
+                    check_symbolic(n, n)
+            self.assertEqual(len(shadow_evaluator.futures), 1)
+            release.set()
+            shadow_evaluator.wait()
+        with open(self.log_path) as f:
+            self.assertEqual(len(f.readlines()), 1)
@@ -0,0 +1,116 @@
+import math
+import unittest
+from unittest.mock import patch
+
+from io import StringIO
+
+from ..core import check_distribution, check_estimate
+from ..stochastic import (
+    as_sample, ks_two_sample, compare_distribution, compare_estimate,
+)
+
+
+def normal_cdf(x):
+    import numpy as np
+    from math import erf
+    return 0.5 * (1 + np.vectorize(erf)(np.asarray(x) / math.sqrt(2)))
+
+
+class Tests(unittest.TestCase):
+
+    def setUp(self):
+        import numpy as np
+        self.rng = np.random.default_rng(1234)
+        self.correct_output = '✅ Success!\n'
+
+    def test_subsample(self):
+        '''Large samples are sub-sampled deterministically'''
+        import numpy as np
+        values = self.rng.normal(size=(100, 100))
+        sample = as_sample(values, max_samples=500)
+        self.assertEqual(sample.shape, (500,))
+        self.assertTrue(np.array_equal(sample, as_sample(values, max_samples=500)))
+        self.assertEqual(as_sample(values, max_samples=None).size, 10000)
+
+    def test_ks_two_sample(self):
+        '''The two-sample KS statistic matches a direct computation'''
+        statistic, p_value = ks_two_sample([1.0, 2.0, 3.0], [1.5, 2.5, 3.5, 4.5])
+        self.assertAlmostEqual(statistic, 0.5)
+        self.assertTrue(0 < p_value <= 1)
+
+    def test_check_distribution_reference_sample(self):
+        '''Compare a student sample to a reference sample'''
+        reference = self.rng.normal(size=5000)
+        answer = self.rng.normal(size=20000)
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_distribution(reference, answer)
+            self.assertEqual(patched_out.getvalue(), self.correct_output)
+        answer = self.rng.normal(loc=0.2, size=20000)
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_distribution(reference, answer)
+            self.assertIn('❌ This answer is incorrect.', patched_out.getvalue())
+
+    def test_check_distribution_cdf(self):
+        '''Compare a student sample to a cumulative distribution function'''
+        answer = self.rng.normal(size=2000)
+        self.assertTrue(compare_distribution(normal_cdf, answer)['passed'])
+        answer = self.rng.uniform(-2, 2, size=2000)
+        self.assertFalse(compare_distribution(normal_cdf, answer)['passed'])
+
+    def test_check_estimate(self):
+        '''Check Monte Carlo estimates with a confidence interval'''
+        inside = (self.rng.uniform(size=(2, 100000)) ** 2).sum(axis=0) <= 1
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_estimate(math.pi, 4 * inside)
+            self.assertEqual(patched_out.getvalue(), self.correct_output)
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_estimate(math.pi, 3.1, standard_error=0.01)
+            self.assertIn('❌ This answer is incorrect.', patched_out.getvalue())
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_estimate(math.pi, 3.1)
+            self.assertIn('⚠️ I could not check the answer', patched_out.getvalue())
+
+    def test_too_small_samples(self):
+        '''Samples with fewer than 2 values cannot pass'''
+        with patch('sys.stdout', new=StringIO()) as patched_out:
+            check_estimate(math.pi, [100.0])
+            self.assertIn('⚠️ I could not check the answer', patched_out.getvalue())
+        with self.assertRaises(ValueError):
+            compare_distribution(self.rng.normal(size=100), [50.0])
+        with self.assertRaises(ValueError):
+            compare_estimate(math.pi, 3.1, standard_error=math.inf)
+
+    def test_undefined_mean(self):
+        '''Distributions without a finite mean are checked with the KS test only'''
+        import numpy as np
+
+        class Cauchy:
+            def cdf(self, x):
+                return 0.5 + np.arctan(x) / np.pi
+
+            def mean(self):
+                return np.nan
+
+            def std(self):
+                return np.nan
+
+        self.assertTrue(compare_distribution(Cauchy(), self.rng.standard_cauchy(2000))['passed'])
+        self.assertFalse(compare_distribution(Cauchy(), self.rng.normal(size=2000))['passed'])
+
+    def test_subsample_non_contiguous_ints(self):
+        '''Sub-sampling selects from the raw array before converting'''
+        values = self.rng.integers(0, 10, size=(300, 300))[:, ::2]
+        sample = as_sample(values, max_samples=100)
+        self.assertEqual(sample.dtype, float)
+        self.assertEqual(sample.shape, (100,))
+        self.assertTrue(set(sample) <= set(range(10)))
+
+    def test_estimate_with_standard_error_and_subsampling(self):
+        '''A given standard error is used with the mean of all samples'''
+        samples = self.rng.normal(1, 1, size=200000)
+        standard_error = samples.std() / math.sqrt(samples.size)
+        result = compare_estimate(
+            1, samples, standard_error=standard_error, max_samples=1000)
+        self.assertEqual(result['statistics']['estimate'], float(samples.mean()))
+        self.assertEqual(result['statistics']['sample_size'], samples.size)
+        self.assertTrue(result['passed'])
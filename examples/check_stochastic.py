@@ -0,0 +1,36 @@
+'''
+This example shows how to check answers that are random. Samples are compared
+to an expected distribution with statistical tests, and Monte Carlo estimates
+are accepted if the expected value lies in a confidence interval around them.
+'''
+import autocheck
+import numpy as np
+
+rng = np.random.default_rng()
+
+# The expected distribution can be given as a reference sample. A frozen SciPy
+# distribution, such as scipy.stats.norm(0, 1), or a cumulative distribution
+# function also work.
+print('\n————————\n📋 TEST: Sample from a standard normal distribution\n————————\n')
+autocheck.check_distribution(
+    name = 'test_stochastic_1',
+    expected = rng.normal(size=10000),
+    answer = rng.normal(size=10000))
+
+
+# Samples from the wrong distribution are rejected.
+print('\n————————\n📋 TEST: Sample from the wrong distribution\n————————\n')
+autocheck.check_distribution(
+    name = 'test_stochastic_2',
+    expected = rng.normal(size=10000),
+    answer = rng.uniform(-2, 2, size=10000))
+
+
+# A Monte Carlo estimate of pi. The answer is the array of per-trial values and
+# the estimate is their mean. The standard error is computed from the samples.
+print('\n————————\n📋 TEST: Monte Carlo estimate of pi\n————————\n')
+inside = (rng.uniform(size=(2, 100000)) ** 2).sum(axis=0) <= 1
+autocheck.check_estimate(
+    name = 'test_stochastic_3',
+    expected = np.pi,
+    answer = 4 * inside)